@@ -8,13 +8,21 @@ import os
 import sys
 import socket
 import json
+import re
 import threading
-import webbrowser
+import concurrent.futures
+import collections
+import time
 import zipfile
-import io
 import shutil
+import gzip
+import zlib
+import array
+import hashlib
+import mmap
+import importlib.util
 from pathlib import Path
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 import socketserver
 import urllib.parse
 from datetime import datetime
@@ -22,12 +30,59 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from tkinter.scrolledtext import ScrolledText
 
-try:    
-    import qrcode
-    from PIL import Image, ImageTk
-    HAS_QRCODE = True
+# qrcode and Pillow are imported on first use (see build_qr_image); loading
+# them here would add their start-up cost even when no server is started
+HAS_QRCODE = (importlib.util.find_spec("qrcode") is not None
+              and importlib.util.find_spec("PIL") is not None)
+
+# numba (and numpy) load in ~0.2 s, and are only used for huge folders, so
+# they are imported the first time one is sized (see folder_size_summer)
+HAS_NUMBA = (importlib.util.find_spec("numba") is not None
+             and importlib.util.find_spec("numpy") is not None)
+
+try:
+    import htmlmin
+    HAS_HTMLMIN = True
+except ImportError:
+    HAS_HTMLMIN = False
+
+try:
+    import rcssmin
+    HAS_RCSSMIN = True
 except ImportError:
-    HAS_QRCODE = False
+    HAS_RCSSMIN = False
+
+try:
+    import deflate
+    HAS_LIBDEFLATE = True
+except ImportError:
+    HAS_LIBDEFLATE = False
+
+# Below this many files the JIT dispatch costs more than the plain sum() saves
+NUMBA_MIN_FILES = 10_000
+# Sums an array('q') of file sizes; built by folder_size_summer() on first use
+numba_sum_sizes = None
+
+def folder_size_summer():
+    """Import numba and build the JIT-compiled size summer, or None if it can't load"""
+    global numba_sum_sizes, HAS_NUMBA
+    if numba_sum_sizes is None:
+        try:
+            import numpy as np
+            from numba import njit
+        except ImportError:
+            HAS_NUMBA = False
+            return None
+        
+        @njit(cache=True)
+        def sum_file_sizes(sizes):
+            total = 0
+            for i in range(sizes.shape[0]):
+                total += sizes[i]
+            return total
+        
+        numba_sum_sizes = lambda sizes: int(sum_file_sizes(np.frombuffer(sizes, dtype=np.int64)))
+    return numba_sum_sizes
 
 # Configuration - Use current working directory as the share folder
 # Files in this directory will be available for download to phone
@@ -36,6 +91,19 @@ SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))  # Directory where scrip
 DOWNLOAD_DIR = os.getcwd()  # Current directory where script is opened
 UPLOAD_DIR = os.path.join(SCRIPT_DIR, "uploads")  # Uploads go to script's uploads folder
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+DOWNLOAD_ROOT = Path(DOWNLOAD_DIR).resolve()  # Resolved once for path containment checks
+
+# Control characters are dropped from uploaded filenames
+FILENAME_TRANSLATION = dict.fromkeys(range(32))
+
+
+def resolve_shared_path(relative_path):
+    """Resolve a client-supplied path inside DOWNLOAD_DIR, or None if it escapes it"""
+    target = (DOWNLOAD_ROOT / relative_path).resolve()
+    if target != DOWNLOAD_ROOT and DOWNLOAD_ROOT not in target.parents:
+        return None
+    return target
+
 
 def format_file_size(size_bytes):
     """Convert bytes to human readable format"""
@@ -109,6 +177,34 @@ def get_available_ram():
 DEFAULT_PORT_HOTSPOT = 1234
 DEFAULT_PORT_INTERNET = 1234
 
+# Single byte range from a "Range: bytes=start-end" request header
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+# Read size for streaming files when os.sendfile is not available
+COPY_CHUNK_SIZE = 1024 * 1024
+# Without sendfile, ranges larger than this are sent from a memory map
+MMAP_MIN_SIZE = 4 * 1024 * 1024
+
+# Per-connection socket buffers, so more data can be in flight on high-latency Wi-Fi
+SOCKET_BUFFER_SIZE = 2 * 1024 * 1024
+
+def can_raise_socket_buffers():
+    """Check that a fixed SOCKET_BUFFER_SIZE won't be capped below Linux's autotuning"""
+    # Setting SO_SNDBUF/SO_RCVBUF turns off Linux's buffer autotuning and is
+    # clamped to net.core.wmem_max/rmem_max, so only do it when those allow it
+    if not sys.platform.startswith('linux'):
+        return True
+    try:
+        for limit in ('wmem_max', 'rmem_max'):
+            with open(f'/proc/sys/net/core/{limit}') as f:
+                if int(f.read()) < SOCKET_BUFFER_SIZE:
+                    return False
+    except (OSError, ValueError):
+        return False
+    return True
+
+RAISE_SOCKET_BUFFERS = can_raise_socket_buffers()
+
 # Global max upload size (will be set based on user's RAM input)
 # Default to 4GB, will be updated when user provides RAM info
 MAX_UPLOAD_SIZE = 4 * 1024 * 1024 * 1024  # 4GB default
@@ -120,8 +216,37 @@ def set_max_upload_size(ram_gb):
     USER_RAM_GB = ram_gb
     # Use 80% of user's RAM as max upload size
     MAX_UPLOAD_SIZE = int(ram_gb * 0.8 * 1024 * 1024 * 1024)
+    # Waiting uploads re-check against the new limit
+    with upload_budget:
+        upload_budget.notify_all()
     return MAX_UPLOAD_SIZE
 
+# Uploads are read into memory whole, so with one thread per connection the
+# bodies in flight share MAX_UPLOAD_SIZE instead of each getting all of it
+upload_budget = threading.Condition()
+upload_bytes_reserved = 0
+# How long an upload waits for budget (503 after), and how long reading its
+# body may stall, so one slow client can't hold up every other upload
+UPLOAD_BUDGET_WAIT_SECONDS = 60
+UPLOAD_READ_TIMEOUT = 60
+
+def reserve_upload_bytes(size):
+    """Wait until size bytes fit in the shared upload budget (False if they don't in time)"""
+    global upload_bytes_reserved
+    with upload_budget:
+        if not upload_budget.wait_for(lambda: upload_bytes_reserved + size <= MAX_UPLOAD_SIZE,
+                                      UPLOAD_BUDGET_WAIT_SECONDS):
+            return False
+        upload_bytes_reserved += size
+        return True
+
+def release_upload_bytes(size):
+    """Return bytes reserved by reserve_upload_bytes and wake waiting uploads"""
+    global upload_bytes_reserved
+    with upload_budget:
+        upload_bytes_reserved -= size
+        upload_budget.notify_all()
+
 
 # Chill Dark Theme Colors - Relaxing & Professional
 class ThemeColors:
@@ -161,17 +286,33 @@ class ThemeColors:
     BORDER = "#2d3748"            # Soft border
     BORDER_LIGHT = "#4a5568"      # Lighter border
 
-# Global reference for logging
-log_callback = None
+# Log messages as (time, message), appended from handler threads and the GUI
+# and drained by the GUI on the Tk thread (deque append/popleft are atomic, so
+# no lock is needed)
+log_queue = collections.deque(maxlen=10000)
+LOG_FLUSH_INTERVAL_MS = 100
+# Oldest lines are trimmed from the Activity Log past this many
+MAX_LOG_LINES = 5000
+# Activity Log color for lines starting with a ✓/✗ marker
+LOG_MARKER_TAGS = {"✓": "success", "✗": "error"}
+# Color for all other lines: each named group is the text tag used when it
+# matches
+LOG_LEVEL_RE = re.compile(
+    r"(?P<success>success|started|uploaded|downloaded|copied)"
+    r"|(?P<error>error|failed)"
+    r"|(?P<warning>warning)"
+    r"|(?P<info>mode:|info)",
+    re.IGNORECASE,
+)
 
-# Connection tracking
+# Request log timestamp, re-formatted at most once per second
+last_log_second = 0
+last_log_timestamp = ""
+
+# Connection tracking (handlers run on one thread per connection)
 connection_count = 0
 connection_callback = None
-
-
-def set_log_callback(callback):
-    global log_callback
-    log_callback = callback
+connection_lock = threading.Lock()
 
 
 def set_connection_callback(callback):
@@ -181,61 +322,28 @@ def set_connection_callback(callback):
 
 def increment_connection():
     global connection_count, connection_callback
-    connection_count += 1
+    with connection_lock:
+        connection_count += 1
+        count = connection_count
     if connection_callback:
-        connection_callback(connection_count)
+        connection_callback(count)
 
 
 def reset_connection_count():
     global connection_count, connection_callback
-    connection_count = 0
+    with connection_lock:
+        connection_count = 0
     if connection_callback:
-        connection_callback(connection_count)
+        connection_callback(0)
 
 
 def log_message(message):
-    global log_callback
-    if log_callback:
-        log_callback(message)
-
-
-class HotspotTransferHandler(SimpleHTTPRequestHandler):
-    """Handler for WiFi Direct/Hotspot mode transfers"""
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, directory=DOWNLOAD_DIR, **kwargs)
+    # Stamp the event now; the GUI may only show it on its next flush
+    log_queue.append((time.time(), message))
 
-    def log_message(self, format: str, *args):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        msg = f"[{timestamp}] {self.client_address[0]} - {format % args}"
-        log_message(msg)
-
-    def do_GET(self):
-        increment_connection()  # Track connection
-        if self.path == "/" or self.path == "/index.html":
-            self.show_web_interface()
-        elif self.path.startswith("/upload"):
-            self.upload_form()
-        elif self.path.startswith("/api/files"):
-            self.list_files_json()
-        elif self.path.startswith("/download-selected"):
-            self.download_selected()
-        elif self.path.startswith("/download-folder/"):
-            self.download_folder()
-        elif self.path.startswith("/download/"):
-            self.download_file()
-        else:
-            super().do_GET()
-
-    def do_POST(self):
-        increment_connection()  # Track connection
-        if self.path.startswith("/upload"):
-            self.handle_file_upload()
-        else:
-            self.send_error(404, "File Upload Error")
 
-    def upload_form(self):
-        html = """<!DOCTYPE html>
+# Web interface pages served to the phone browser
+HOTSPOT_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -570,6 +678,15 @@ class HotspotTransferHandler(SimpleHTTPRequestHandler):
         let selectedItems = new Set();
         let currentItems = [];
         
+        const sizeObserver = 'IntersectionObserver' in window ? new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (!entry.isIntersecting) return;
+                sizeObserver.unobserve(entry.target);
+                const item = currentItems[parseInt(entry.target.id.slice(5))];
+                if (item) loadFolderSize(item);
+            });
+        }) : null;
+        
         uploadArea.onclick = () => fileInput.click();
         fileInput.onchange = (e) => uploadFiles(e.target.files);
         uploadArea.ondragover = (e) => { e.preventDefault(); uploadArea.classList.add('dragover'); };
@@ -687,7 +804,7 @@ class HotspotTransferHandler(SimpleHTTPRequestHandler):
                 fileList.innerHTML = '<li class="empty-state"><div class="icon">📂</div><p>No files here</p></li>';
                 return;
             }
-            fileList.innerHTML = currentItems.map(item => {
+            fileList.innerHTML = currentItems.map((item, idx) => {
                 const isFolder = item.type === 'folder';
                 const icon = isFolder ? '📁' : '📄';
                 const typeLabel = isFolder ? '<span class="file-type folder">Folder</span>' : '<span class="file-type">File</span>';
@@ -699,11 +816,38 @@ class HotspotTransferHandler(SimpleHTTPRequestHandler):
                     '<span class="file-icon">' + icon + '</span>' +
                     '<div class="file-info">' +
                         '<div class="file-name" onclick="' + clickAction + '">' + item.name + '</div>' +
-                        '<div class="file-meta">' + formatSize(item.size) + ' ' + typeLabel + '</div>' +
+                        '<div class="file-meta"><span' + (isFolder ? ' id="size-' + idx + '"' : '') + '>' + formatSize(item.size) + '</span> ' + typeLabel + '</div>' +
                     '</div>' +
                     '<a href="' + dlUrl + '" class="btn-download">⬇️ ' + (isFolder ? 'ZIP' : 'Get') + '</a>' +
                 '</li>';
             }).join('');
+            observeFolderSizes();
+        }
+        
+        function observeFolderSizes() {
+            if (sizeObserver) sizeObserver.disconnect();
+            currentItems.forEach((item, idx) => {
+                if (item.type !== 'folder' || item.size != null) return;
+                if (sizeObserver) {
+                    sizeObserver.observe(document.getElementById('size-' + idx));
+                } else {
+                    loadFolderSize(item);
+                }
+            });
+        }
+        
+        async function loadFolderSize(item) {
+            if (item.sizeLoading) return;
+            item.sizeLoading = true;
+            try {
+                const res = await fetch('/api/folder-size?path=' + encodeURIComponent(item.path));
+                const data = await res.json();
+                item.size = data.size;
+                const idx = currentItems.indexOf(item);
+                if (idx !== -1) document.getElementById('size-' + idx).textContent = formatSize(item.size);
+            } catch (e) {
+                item.sizeLoading = false;
+            }
         }
         
         async function refreshFiles() {
@@ -727,6 +871,7 @@ class HotspotTransferHandler(SimpleHTTPRequestHandler):
         }
         
         function formatSize(bytes) {
+            if (bytes == null) return '…';
             if (bytes === 0) return '0 B';
             const k = 1024, sizes = ['B', 'KB', 'MB', 'GB'];
             const i = Math.floor(Math.log(bytes) / Math.log(k));
@@ -737,270 +882,8 @@ class HotspotTransferHandler(SimpleHTTPRequestHandler):
     </script>
 </body>
 </html>"""
-        self.send_response(200)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
-        self.send_header("Pragma", "no-cache")
-        self.send_header("Expires", "0")
-        self.end_headers()
-        self.wfile.write(html.encode("utf-8"))
-
-    def handle_file_upload(self):
-        try:
-            content_length = int(self.headers.get("Content-Length", 0))
-            max_size_gb = MAX_UPLOAD_SIZE / (1024 * 1024 * 1024)
-            if content_length > MAX_UPLOAD_SIZE:
-                self.send_error(413, f"File too large (max {max_size_gb:.1f}GB based on RAM)")
-                return
-
-            boundary = self.headers.get('Content-Type').split('boundary=')[-1]
-            data = self.rfile.read(content_length)
-            
-            parts = data.split(f'--{boundary}'.encode())
-            for part in parts:
-                if b'Content-Disposition' in part and b'filename=' in part:
-                    filename_start = part.find(b'filename="') + 10
-                    filename_end = part.find(b'"', filename_start)
-                    filename = part[filename_start:filename_end].decode()
-                    
-                    file_start = part.find(b'\r\n\r\n') + 4
-                    file_end = part.rfind(b'\r\n')
-                    file_data = part[file_start:file_end]
-                    
-                    safe_filename = os.path.basename(filename)
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    unique_filename = f"{timestamp}_{safe_filename}"
-                    filepath = os.path.join(UPLOAD_DIR, unique_filename)
-                    
-                    with open(filepath, 'wb') as f:
-                        f.write(file_data)
-                    
-                    log_message(f"✓ Uploaded: {unique_filename} ({len(file_data)} bytes)")
-
-            response = json.dumps({"status": "success"}).encode()
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Content-Length', len(response))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(response)
-            
-        except Exception as e:
-            log_message(f"✗ Upload error: {e}")
-            self.send_error(500, f"Upload failed: {str(e)}")
-
-    def list_files_json(self):
-        try:
-            # Get optional path parameter for subdirectory browsing
-            parsed = urllib.parse.urlparse(self.path)
-            params = urllib.parse.parse_qs(parsed.query)
-            subpath = params.get('path', [''])[0]
-            
-            # Sanitize path to prevent directory traversal
-            if subpath:
-                subpath = subpath.lstrip('/').replace('..', '')
-            
-            target_dir = os.path.join(DOWNLOAD_DIR, subpath) if subpath else DOWNLOAD_DIR
-            
-            if not os.path.exists(target_dir) or not os.path.isdir(target_dir):
-                target_dir = DOWNLOAD_DIR
-                subpath = ''
-            
-            items = []
-            for filename in os.listdir(target_dir):
-                # Skip hidden files and folders (starting with .)
-                if filename.startswith('.'):
-                    continue
-                    
-                filepath = os.path.join(target_dir, filename)
-                relative_path = os.path.join(subpath, filename) if subpath else filename
-                
-                if os.path.isfile(filepath):
-                    items.append({
-                        "name": filename,
-                        "path": relative_path,
-                        "size": os.path.getsize(filepath),
-                        "type": "file"
-                    })
-                elif os.path.isdir(filepath):
-                    # Calculate folder size
-                    folder_size = self.get_folder_size(filepath)
-                    items.append({
-                        "name": filename,
-                        "path": relative_path,
-                        "size": folder_size,
-                        "type": "folder"
-                    })
-            
-            response_data = {
-                "items": items,
-                "currentPath": subpath,
-                "parentPath": os.path.dirname(subpath) if subpath else None
-            }
-            
-            response = json.dumps(response_data).encode()
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Content-Length', len(response))
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
-            self.wfile.write(response)
-            
-        except Exception as e:
-            log_message(f"✗ Error listing files: {e}")
-            self.send_error(500, f"Error listing files: {str(e)}")
-    
-    def get_folder_size(self, folder_path):
-        """Calculate total size of a folder"""
-        total_size = 0
-        for dirpath, dirnames, filenames in os.walk(folder_path):
-            # Skip hidden directories
-            dirnames[:] = [d for d in dirnames if not d.startswith('.')]
-            for filename in filenames:
-                # Skip hidden files
-                if filename.startswith('.'):
-                    continue
-                filepath = os.path.join(dirpath, filename)
-                try:
-                    total_size += os.path.getsize(filepath)
-                except (OSError, IOError):
-                    pass
-        return total_size
-    
-    def download_folder(self):
-        """Download a folder as ZIP"""
-        try:
-            folder_path = urllib.parse.unquote(self.path.split("/download-folder/")[-1])
-            full_path = Path(DOWNLOAD_DIR) / folder_path
-            
-            if not full_path.exists() or not full_path.is_dir():
-                self.send_error(404, "Folder not found")
-                return
-            
-            # Create ZIP in memory
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for root, dirs, files in os.walk(full_path):
-                    # Skip hidden directories
-                    dirs[:] = [d for d in dirs if not d.startswith('.')]
-                    for file in files:
-                        # Skip hidden files
-                        if file.startswith('.'):
-                            continue
-                        file_path = os.path.join(root, file)
-                        arcname = os.path.relpath(file_path, full_path)
-                        zip_file.write(file_path, arcname)
-            
-            zip_content = zip_buffer.getvalue()
-            zip_filename = f"{full_path.name}.zip"
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/zip')
-            self.send_header('Content-Disposition', f'attachment; filename="{zip_filename}"')
-            self.send_header('Content-Length', len(zip_content))
-            self.end_headers()
-            self.wfile.write(zip_content)
-            
-            log_message(f"✓ Downloaded folder: {folder_path}")
-            
-        except Exception as e:
-            log_message(f"✗ Folder download error: {e}")
-            self.send_error(500, f"Download failed: {str(e)}")
-    
-    def download_selected(self):
-        """Download multiple selected files/folders as ZIP"""
-        try:
-            parsed = urllib.parse.urlparse(self.path)
-            params = urllib.parse.parse_qs(parsed.query)
-            items_param = params.get('items', [''])[0]
-            
-            if not items_param:
-                self.send_error(400, "No items selected")
-                return
-            
-            items = items_param.split(',')
-            items = [urllib.parse.unquote(item) for item in items if item]
-            
-            if not items:
-                self.send_error(400, "No items selected")
-                return
-            
-            # Create ZIP in memory
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for item in items:
-                    item_path = Path(DOWNLOAD_DIR) / item
-                    if not item_path.exists():
-                        continue
-                    
-                    if item_path.is_file():
-                        zip_file.write(item_path, item_path.name)
-                    elif item_path.is_dir():
-                        for root, dirs, files in os.walk(item_path):
-                            # Skip hidden directories
-                            dirs[:] = [d for d in dirs if not d.startswith('.')]
-                            for file in files:
-                                # Skip hidden files
-                                if file.startswith('.'):
-                                    continue
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.join(item_path.name, os.path.relpath(file_path, item_path))
-                                zip_file.write(file_path, arcname)
-            
-            zip_content = zip_buffer.getvalue()
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            zip_filename = f"download_{timestamp}.zip"
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/zip')
-            self.send_header('Content-Disposition', f'attachment; filename="{zip_filename}"')
-            self.send_header('Content-Length', len(zip_content))
-            self.end_headers()
-            self.wfile.write(zip_content)
-            
-            log_message(f"✓ Downloaded {len(items)} selected items")
-            
-        except Exception as e:
-            log_message(f"✗ Batch download error: {e}")
-            self.send_error(500, f"Download failed: {str(e)}")
-
-    def download_file(self):
-        try:
-            file_path = urllib.parse.unquote(self.path.split("/download/")[-1])
-            filepath = Path(DOWNLOAD_DIR) / file_path
-            
-            if not filepath.exists() or not filepath.is_file():
-                self.send_error(404, "File not found")
-                return
-            
-            with open(filepath, 'rb') as f:
-                content = f.read()
-            
-            # Get just the filename for the download
-            filename = filepath.name
-            
-            self.send_response(200)
-            self.send_header('Content-type', 'application/octet-stream')
-            self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
-            self.send_header('Content-Length', len(content))
-            self.end_headers()
-            self.wfile.write(content)
-            
-            log_message(f"✓ Downloaded: {file_path}")
-            
-        except Exception as e:
-            log_message(f"✗ Download error: {e}")
-            self.send_error(500, f"Download failed: {str(e)}")
-
-    def show_web_interface(self):
-        self.upload_form()
 
-
-class InternetTransferHandler(HotspotTransferHandler):
-    """Handler for Internet/WiFi mode transfers - inherits from Hotspot with different styling"""
-    
-    def upload_form(self):
-        html = """<!DOCTYPE html>
+INTERNET_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -1335,6 +1218,15 @@ class InternetTransferHandler(HotspotTransferHandler):
         let selectedItems = new Set();
         let currentItems = [];
         
+        const sizeObserver = 'IntersectionObserver' in window ? new IntersectionObserver(entries => {
+            entries.forEach(entry => {
+                if (!entry.isIntersecting) return;
+                sizeObserver.unobserve(entry.target);
+                const item = currentItems[parseInt(entry.target.id.slice(5))];
+                if (item) loadFolderSize(item);
+            });
+        }) : null;
+        
         uploadArea.onclick = () => fileInput.click();
         fileInput.onchange = (e) => uploadFiles(e.target.files);
         uploadArea.ondragover = (e) => { e.preventDefault(); uploadArea.classList.add('dragover'); };
@@ -1452,7 +1344,7 @@ class InternetTransferHandler(HotspotTransferHandler):
                 fileList.innerHTML = '<li class="empty-state"><div class="icon">📂</div><p>No files here</p></li>';
                 return;
             }
-            fileList.innerHTML = currentItems.map(item => {
+            fileList.innerHTML = currentItems.map((item, idx) => {
                 const isFolder = item.type === 'folder';
                 const icon = isFolder ? '📁' : '📄';
                 const typeLabel = isFolder ? '<span class="file-type folder">Folder</span>' : '<span class="file-type">File</span>';
@@ -1464,11 +1356,38 @@ class InternetTransferHandler(HotspotTransferHandler):
                     '<span class="file-icon">' + icon + '</span>' +
                     '<div class="file-info">' +
                         '<div class="file-name" onclick="' + clickAction + '">' + item.name + '</div>' +
-                        '<div class="file-meta">' + formatSize(item.size) + ' ' + typeLabel + '</div>' +
+                        '<div class="file-meta"><span' + (isFolder ? ' id="size-' + idx + '"' : '') + '>' + formatSize(item.size) + '</span> ' + typeLabel + '</div>' +
                     '</div>' +
                     '<a href="' + dlUrl + '" class="btn-download">⬇️ ' + (isFolder ? 'ZIP' : 'Get') + '</a>' +
                 '</li>';
             }).join('');
+            observeFolderSizes();
+        }
+        
+        function observeFolderSizes() {
+            if (sizeObserver) sizeObserver.disconnect();
+            currentItems.forEach((item, idx) => {
+                if (item.type !== 'folder' || item.size != null) return;
+                if (sizeObserver) {
+                    sizeObserver.observe(document.getElementById('size-' + idx));
+                } else {
+                    loadFolderSize(item);
+                }
+            });
+        }
+        
+        async function loadFolderSize(item) {
+            if (item.sizeLoading) return;
+            item.sizeLoading = true;
+            try {
+                const res = await fetch('/api/folder-size?path=' + encodeURIComponent(item.path));
+                const data = await res.json();
+                item.size = data.size;
+                const idx = currentItems.indexOf(item);
+                if (idx !== -1) document.getElementById('size-' + idx).textContent = formatSize(item.size);
+            } catch (e) {
+                item.sizeLoading = false;
+            }
         }
         
         async function refreshFiles() {
@@ -1492,6 +1411,7 @@ class InternetTransferHandler(HotspotTransferHandler):
         }
         
         function formatSize(bytes) {
+            if (bytes == null) return '…';
             if (bytes === 0) return '0 B';
             const k = 1024, sizes = ['B', 'KB', 'MB', 'GB'];
             const i = Math.floor(Math.log(bytes) / Math.log(k));
@@ -1502,56 +1422,937 @@ class InternetTransferHandler(HotspotTransferHandler):
     </script>
 </body>
 </html>"""
-        self.send_response(200)
-        self.send_header("Content-Type", "text/html; charset=utf-8")
-        self.send_header("Cache-Control", "no-cache, no-store, must-revalidate")
-        self.send_header("Pragma", "no-cache")
-        self.send_header("Expires", "0")
-        self.end_headers()
-        self.wfile.write(html.encode("utf-8"))
 
 
-def get_local_ip():
-    """Get local IP address"""
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        ip = s.getsockname()[0]
-        s.close()
-        return ip
-    except:
-        return "127.0.0.1"
+def minify_html(html):
+    """Minify the inline CSS and the page markup (no-op without htmlmin/rcssmin)"""
+    if HAS_RCSSMIN:
+        head, sep, rest = html.partition("<style>")
+        css, sep2, tail = rest.partition("</style>")
+        if sep and sep2:
+            html = head + sep + rcssmin.cssmin(css) + sep2 + tail
+    if HAS_HTMLMIN:
+        html = htmlmin.minify(html, remove_comments=True, remove_empty_space=True, keep_pre=False)
+    return html
 
 
-class NetTossGUI:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("NetToss - Wireless File Transfer")
-        self.root.geometry("1050x900")
-        self.root.resizable(True, True)
-        self.root.minsize(850, 750)
-        
-        # Set window icon
-        self.set_window_icon()
-        
-        # Center window on screen
-        self.center_window(1050, 900)
-        
-        # Server state
-        self.server = None
-        self.server_thread = None
-        self.is_running = False
-        
-        # Variables
-        self.mode_var = tk.StringVar(value="hotspot")
-        self.port_var = tk.StringVar(value=str(DEFAULT_PORT_HOTSPOT))
-        
-        # Set up log callback
-        set_log_callback(self.log)
-        
-        # Build UI
+# Minified once at import so requests only write precomputed bytes
+HOTSPOT_HTML_BYTES = minify_html(HOTSPOT_HTML).encode("utf-8")
+INTERNET_HTML_BYTES = minify_html(INTERNET_HTML).encode("utf-8")
+
+# HTTP version spoken by the transfer handlers. Every response closes its
+# connection, so the stdlib request parsing runs once per connection and reads
+# the header block through rfile's buffer rather than a syscall per line
+HTTP_PROTOCOL_VERSION = "HTTP/1.0"
+
+
+def build_page_response(body, etag, gzipped=False):
+    """Prebuild the full static page response: status line, headers and body"""
+    encoding = "Content-Encoding: gzip\r\n" if gzipped else ""
+    # no-cache (not no-store) lets the browser keep the page and revalidate it
+    headers = (
+        f"{HTTP_PROTOCOL_VERSION} 200 OK\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n"
+        f"{encoding}"
+        "Vary: Accept-Encoding\r\n"
+        f"ETag: {etag}\r\n"
+        "Cache-Control: no-cache\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "\r\n"
+    )
+    return headers.encode("latin-1") + body
+
+
+def build_not_modified_response(etag):
+    """Prebuild the 304 sent when the browser already has the current page"""
+    headers = (
+        f"{HTTP_PROTOCOL_VERSION} 304 Not Modified\r\n"
+        "Vary: Accept-Encoding\r\n"
+        f"ETag: {etag}\r\n"
+        "Cache-Control: no-cache\r\n"
+        "\r\n"
+    )
+    return headers.encode("latin-1")
+
+
+def build_page_variants(body):
+    """Map gzip on/off to the page's (etag, response, not_modified, body_length)"""
+    variants = {}
+    for gzipped in (False, True):
+        # mtime=0 keeps the gzip bytes, and so the ETag, stable across restarts
+        data = gzip.compress(body, 9, mtime=0) if gzipped else body
+        etag = '"' + hashlib.blake2b(data, digest_size=8).hexdigest() + '"'
+        variants[gzipped] = (etag, build_page_response(data, etag, gzipped),
+                             build_not_modified_response(etag), len(data))
+    return variants
+
+
+# Plain and gzip-compressed variants, picked per request from Accept-Encoding
+HOTSPOT_PAGE = build_page_variants(HOTSPOT_HTML_BYTES)
+INTERNET_PAGE = build_page_variants(INTERNET_HTML_BYTES)
+
+
+def content_disposition(filename):
+    """Build an attachment Content-Disposition value that is safe for any filename"""
+    # Plain ASCII name for old clients, the exact UTF-8 name for everyone else;
+    # control characters and quotes can't break out of the header either way
+    fallback = filename.translate(FILENAME_TRANSLATION).replace('"', "'").replace('\\', '_')
+    fallback = fallback.encode('ascii', 'replace').decode('ascii')
+    quoted = urllib.parse.quote(filename, safe='', errors='replace')
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quoted}"
+
+
+# ZIP downloads
+ZIP_COMPRESS_LEVEL = 6
+ZIP_WORKERS = os.cpu_count() or 1
+# Files up to this size are read whole and deflated on the worker pool;
+# larger ones stream through zipfile's own compressor in constant memory
+PRECOMPRESS_MAX_FILE_SIZE = 4 * 1024 * 1024
+# Per download, at most this many bytes of files are submitted to the pool
+# but not yet written to the archive
+ZIP_MAX_PENDING_BYTES = 32 * 1024 * 1024
+# Already-compressed formats are stored as-is; deflate gains ~nothing on them
+NO_COMPRESS_EXTENSIONS = frozenset({
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic',
+    '.mp3', '.mp4', '.mkv', '.mov', '.avi', '.webm', '.opus', '.flac', '.m4a', '.ogg',
+    '.zip', '.gz', '.xz', '.7z', '.rar', '.bz2', '.zst', '.apk', '.pdf',
+})
+
+# Recently deflated files, keyed by (path, mtime_ns, size) so an edited file
+# misses; a folder zipped again is then served without recompressing it
+ZIP_CACHE_MAX_BYTES = 512 * 1024 * 1024
+zip_cache = collections.OrderedDict()
+zip_cache_bytes = 0
+zip_cache_lock = threading.Lock()
+
+# One deflate pool shared by every download, so concurrent ZIP downloads
+# don't each start cpu_count threads; they only spawn on first use
+zip_pool = concurrent.futures.ThreadPoolExecutor(max_workers=ZIP_WORKERS, thread_name_prefix="zip")
+
+
+def iter_tree(root, prefix=''):
+    """Yield (file_path, arcname, stat) for every non-hidden file below root"""
+    stack = [(os.fspath(root), prefix)]
+    while stack:
+        directory, prefix = stack.pop()
+        try:
+            it = os.scandir(directory)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                # Skip hidden files and directories
+                if entry.name.startswith('.'):
+                    continue
+                # DirEntry caches the type, so no extra stat per entry; like
+                # os.walk, symlinked directories are not followed
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, prefix + entry.name + '/'))
+                elif entry.is_file():
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    yield entry.path, prefix + entry.name, st
+
+
+def compress_file(file_path):
+    """Read a file and raw-deflate it, returning (crc, size, data)"""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if HAS_LIBDEFLATE:
+        return deflate.crc32(data), len(data), deflate.deflate_compress(data, ZIP_COMPRESS_LEVEL)
+    compressor = zlib.compressobj(ZIP_COMPRESS_LEVEL, zlib.DEFLATED, -15)
+    return zlib.crc32(data), len(data), compressor.compress(data) + compressor.flush()
+
+
+def compress_file_cached(file_path, st):
+    """compress_file() through the LRU cache of recently zipped files"""
+    global zip_cache_bytes
+    key = (file_path, st.st_mtime_ns, st.st_size)
+    with zip_cache_lock:
+        cached = zip_cache.get(key)
+        if cached is not None:
+            zip_cache.move_to_end(key)
+            return cached
+    
+    result = compress_file(file_path)
+    # A size mismatch means the file changed while it was read; don't keep it
+    if result[1] == st.st_size:
+        with zip_cache_lock:
+            if key not in zip_cache:
+                zip_cache[key] = result
+                zip_cache_bytes += len(result[2])
+                while zip_cache_bytes > ZIP_CACHE_MAX_BYTES:
+                    _, evicted = zip_cache.popitem(last=False)
+                    zip_cache_bytes -= len(evicted[2])
+    return result
+
+
+def write_compressed_entry(zip_file, zinfo, crc, size, compressed):
+    """Append an already raw-deflated entry to an open ZipFile without recompressing it"""
+    zinfo.compress_type = zipfile.ZIP_DEFLATED
+    zinfo.CRC = crc
+    zinfo.file_size = size
+    zinfo.compress_size = len(compressed)
+    # CRC and sizes are known up front, so the local header is complete and
+    # no data descriptor is needed even when streaming to a socket
+    zinfo.flag_bits = 0
+    # Mirrors ZipFile._open_to_write() and _ZipWriteFile.close()
+    with zip_file._lock:
+        if zip_file._seekable:
+            zip_file.fp.seek(zip_file.start_dir)
+        zinfo.header_offset = zip_file.fp.tell()
+        zip_file._writecheck(zinfo)
+        zip_file._didModify = True
+        zip_file.fp.write(zinfo.FileHeader())
+        zip_file.fp.write(compressed)
+        zip_file.start_dir = zip_file.fp.tell()
+        zip_file.filelist.append(zinfo)
+        zip_file.NameToInfo[zinfo.filename] = zinfo
+
+
+def stored_zip_size(entries):
+    """Exact size of the streamed ZIP for entries, or None unless every file is stored"""
+    # Stored entries are written unchanged, so the archive size follows from
+    # the names and file sizes; deflated sizes aren't known until compressed
+    if len(entries) > zipfile.ZIP_FILECOUNT_LIMIT:
+        return None
+    total = 22  # end of central directory record
+    for file_path, arcname, st in entries:
+        if os.path.splitext(file_path)[1].lower() not in NO_COMPRESS_EXTENSIONS:
+            return None
+        # zipfile switches to ZIP64 records for files this large
+        if st.st_size * 1.05 > zipfile.ZIP64_LIMIT:
+            return None
+        name_length = len(arcname.encode('utf-8'))
+        # Local header + data + data descriptor, then its central directory record
+        total += 30 + name_length + st.st_size + 16 + 46 + name_length
+    if total > zipfile.ZIP64_LIMIT:
+        return None
+    return total
+
+
+def zip_info_from_stat(arcname, st):
+    """ZipInfo for a file from an existing stat result (ZipInfo.from_file without the stat)"""
+    date_time = time.localtime(st.st_mtime)[:6]
+    # Same clamping as strict_timestamps=False
+    if date_time[0] < 1980:
+        date_time = (1980, 1, 1, 0, 0, 0)
+    elif date_time[0] > 2107:
+        date_time = (2107, 12, 31, 23, 59, 59)
+    zinfo = zipfile.ZipInfo(arcname, date_time)
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    return zinfo
+
+
+def copy_file_to_zip(zip_file, file_path, zinfo):
+    """Stream exactly zinfo.file_size bytes of a file into a ZIP entry"""
+    # The archive (and any Content-Length sent for it) was sized from the
+    # stat taken while listing, so a file that grew is cut at that size and
+    # one that shrank aborts the download rather than mis-framing it
+    remaining = zinfo.file_size
+    with open(file_path, 'rb') as src, zip_file.open(zinfo, 'w') as dest:
+        while remaining:
+            chunk = src.read(min(remaining, COPY_CHUNK_SIZE))
+            if not chunk:
+                raise OSError(f"{file_path} shrank while it was being zipped")
+            dest.write(chunk)
+            remaining -= len(chunk)
+
+
+def write_zip_entries(zip_file, entries):
+    """Add (file_path, arcname, stat) entries to a ZIP, deflating files in parallel"""
+    pending = collections.deque()
+    pending_bytes = 0
+    
+    def write_next():
+        nonlocal pending_bytes
+        zinfo, file_path, future, size = pending.popleft()
+        pending_bytes -= size
+        if future is None:
+            copy_file_to_zip(zip_file, file_path, zinfo)
+        else:
+            write_compressed_entry(zip_file, zinfo, *future.result())
+    
+    # zlib and libdeflate release the GIL while compressing, so the pool
+    # keeps every core busy; entries are written back in submission order.
+    # The stat from iter_tree() is the only one taken per file: it decides
+    # the compression and sizes the ZipInfo (and stored_zip_size())
+    try:
+        for file_path, arcname, st in entries:
+            zinfo = zip_info_from_stat(arcname, st)
+            future = None
+            size = 0
+            if os.path.splitext(file_path)[1].lower() in NO_COMPRESS_EXTENSIONS:
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+                if st.st_size <= PRECOMPRESS_MAX_FILE_SIZE:
+                    # Write finished entries out before this one would push
+                    # the bytes read or compressed in memory past the limit
+                    while pending and pending_bytes + st.st_size > ZIP_MAX_PENDING_BYTES:
+                        write_next()
+                    future = zip_pool.submit(compress_file_cached, file_path, st)
+                    size = st.st_size
+            pending.append((zinfo, file_path, future, size))
+            pending_bytes += size
+        while pending:
+            write_next()
+    finally:
+        # On a failed download, drop work that hasn't started yet
+        for entry in pending:
+            if entry[2] is not None:
+                entry[2].cancel()
+
+
+def stream_zip(fileobj, entries):
+    """Write entries as a ZIP to a stream, leaving it unterminated on errors"""
+    zip_file = zipfile.ZipFile(fileobj, 'w', zipfile.ZIP_DEFLATED)
+    try:
+        write_zip_entries(zip_file, entries)
+    except BaseException:
+        # Without fp neither close() nor __del__ writes the central directory,
+        # so the client sees a truncated download instead of a complete-looking ZIP
+        zip_file.fp = None
+        raise
+    zip_file.close()
+
+
+class HotspotTransferHandler(SimpleHTTPRequestHandler):
+    """Handler for WiFi Direct/Hotspot mode transfers"""
+    
+    protocol_version = HTTP_PROTOCOL_VERSION
+    page = HOTSPOT_PAGE
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=DOWNLOAD_DIR, **kwargs)
+
+    def setup(self):
+        super().setup()
+        # Responses are written whole, so there's nothing for Nagle to coalesce
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if RAISE_SOCKET_BUFFERS:
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        if hasattr(socket, 'TCP_QUICKACK'):
+            # ACK the request (and upload data) right away instead of delaying
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
+    def set_cork(self, corked):
+        """Hold back partial TCP segments while a download is written (Linux only)"""
+        # Corking lets the headers share packets with the first body bytes;
+        # uncorking flushes whatever is left
+        if hasattr(socket, 'TCP_CORK'):
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, int(corked))
+
+    def log_message(self, format: str, *args):
+        global last_log_second, last_log_timestamp
+        now = int(time.time())
+        if now != last_log_second:
+            last_log_timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+            last_log_second = now
+        timestamp = last_log_timestamp
+        msg = f"[{timestamp}] {self.client_address[0]} - {format % args}"
+        log_message(msg)
+
+    def do_GET(self):
+        increment_connection()  # Track connection
+        if self.path == "/" or self.path == "/index.html":
+            self.show_web_interface()
+        elif self.path.startswith("/upload"):
+            self.upload_form()
+        elif self.path.startswith("/api/files"):
+            self.list_files_json()
+        elif self.path.startswith("/api/folder-size"):
+            self.folder_size_json()
+        elif self.path.startswith("/download-selected"):
+            self.download_selected()
+        elif self.path.startswith("/download-folder/"):
+            self.download_folder()
+        elif self.path.startswith("/download/"):
+            self.download_file()
+        else:
+            super().do_GET()
+
+    def do_POST(self):
+        increment_connection()  # Track connection
+        if self.path.startswith("/upload"):
+            self.handle_file_upload()
+        else:
+            self.send_error(404, "File Upload Error")
+
+    def upload_form(self):
+        # Static page: hand the prebuilt headers and body to the socket in one call
+        etag, response, not_modified, body_length = self.page[self.accepts_gzip()]
+        if self.headers.get('If-None-Match') == etag:
+            self.connection.sendall(not_modified)
+            self.log_request(304)
+        else:
+            self.connection.sendall(response)
+            self.log_request(200, body_length)
+
+    def accepts_gzip(self):
+        """Whether the client's Accept-Encoding allows gzip (q=0 refuses it)"""
+        # An explicit gzip entry wins over the "*" wildcard
+        wildcard_q = 0.0
+        for coding in self.headers.get('Accept-Encoding', '').split(','):
+            name, _, params = coding.partition(';')
+            name = name.strip().lower()
+            if name not in ('gzip', 'x-gzip', '*'):
+                continue
+            q = 1.0
+            for param in params.split(';'):
+                key, _, value = param.partition('=')
+                if key.strip().lower() == 'q':
+                    try:
+                        q = float(value)
+                    except ValueError:
+                        q = 0.0
+            if name == '*':
+                wildcard_q = q
+            else:
+                return q > 0
+        return wildcard_q > 0
+    
+    def handle_file_upload(self):
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            if content_length < 0:
+                self.send_error(400, "Invalid Content-Length")
+                return
+            max_size_gb = MAX_UPLOAD_SIZE / (1024 * 1024 * 1024)
+            if content_length > MAX_UPLOAD_SIZE:
+                self.send_error(413, f"File too large (max {max_size_gb:.1f}GB based on RAM)")
+                return
+            
+            content_type = self.headers.get('Content-Type', '')
+            if 'boundary=' not in content_type:
+                self.send_error(400, "Expected multipart/form-data")
+                return
+            boundary = content_type.split('boundary=')[-1]
+            
+            # Concurrent uploads queue here until their bodies fit together
+            if not reserve_upload_bytes(content_length):
+                self.send_error(503, "Server busy with other uploads, try again")
+                return
+            try:
+                self.save_upload_parts(boundary, content_length)
+            finally:
+                # The body is freed when save_upload_parts returns
+                release_upload_bytes(content_length)
+            
+            response = json.dumps({"status": "success"}).encode()
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', len(response))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(response)
+            
+        except Exception as e:
+            log_message(f"✗ Upload error: {e}")
+            self.send_error(500, f"Upload failed: {str(e)}")
+    
+    def save_upload_parts(self, boundary, content_length):
+        """Read a multipart body and save each file part to UPLOAD_DIR"""
+        # A client that stops sending mid-body would otherwise keep its
+        # reserved budget forever
+        self.connection.settimeout(UPLOAD_READ_TIMEOUT)
+        try:
+            data = self.rfile.read(content_length)
+        finally:
+            self.connection.settimeout(None)
+        if len(data) < content_length:
+            raise ConnectionError("upload ended before Content-Length bytes arrived")
+        
+        # Walk the boundaries in place; file bodies are written straight
+        # from a memoryview so no part is copied out of the request body
+        delimiter = f'--{boundary}'.encode()
+        view = memoryview(data)
+        pos = data.find(delimiter)
+        while pos != -1:
+            part_start = pos + len(delimiter)
+            pos = data.find(delimiter, part_start)
+            part_end = pos if pos != -1 else len(data)
+            
+            header_end = data.find(b'\r\n\r\n', part_start, part_end)
+            if header_end == -1:
+                continue
+            headers = data[part_start:header_end]
+            if b'Content-Disposition' in headers and b'filename=' in headers:
+                filename_start = headers.find(b'filename="') + 10
+                filename_end = headers.index(b'"', filename_start)
+                filename = headers[filename_start:filename_end].decode()
+                
+                file_start = header_end + 4
+                # The CRLF before the next boundary is part of the delimiter
+                file_end = part_end - 2 if data.startswith(b'\r\n', part_end - 2) else part_end
+                file_data = view[file_start:file_end]
+                
+                safe_filename = os.path.basename(filename).translate(FILENAME_TRANSLATION)
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                unique_filename = f"{timestamp}_{safe_filename}"
+                filepath = os.path.join(UPLOAD_DIR, unique_filename)
+                
+                with open(filepath, 'wb') as f:
+                    f.write(file_data)
+                
+                log_message(f"✓ Uploaded: {unique_filename} ({len(file_data)} bytes)")
+
+    def list_files_json(self):
+        try:
+            # Get optional path parameter for subdirectory browsing
+            parsed = urllib.parse.urlparse(self.path)
+            params = urllib.parse.parse_qs(parsed.query)
+            subpath = params.get('path', [''])[0]
+            # Recursive folder sizes are only computed when asked for (?sizes=1);
+            # the web UI fetches them lazily from /api/folder-size instead
+            want_sizes = params.get('sizes', ['0'])[0] == '1'
+            
+            # Resolve the path and refuse anything outside the shared folder
+            subpath = subpath.strip('/')
+            target = resolve_shared_path(subpath)
+            if target is None:
+                self.send_error(403, "Access denied")
+                return
+            
+            if not target.is_dir():
+                target = DOWNLOAD_ROOT
+                subpath = ''
+            target_dir = str(target)
+            
+            # One scandir pass collects each entry's stat; the ETag covers every
+            # listed file's mtime and size, since growing a file in place (or a
+            # copy still in progress) doesn't touch the directory's own mtime.
+            # Recursive sizes depend on the whole subtree and are never cached.
+            entries = []
+            with os.scandir(target_dir) as it:
+                for entry in it:
+                    # Skip hidden files and folders (starting with .)
+                    if entry.name.startswith('.'):
+                        continue
+                    if entry.is_file():
+                        entries.append((entry, entry.stat()))
+                    elif entry.is_dir():
+                        entries.append((entry, None))
+            
+            etag = None
+            if not want_sizes:
+                digest = hashlib.blake2b(subpath.encode('utf-8', 'surrogateescape'), digest_size=8)
+                for entry, stat in entries:
+                    if stat is None:
+                        etag_source = f"\0{entry.name}/"
+                    else:
+                        etag_source = f"\0{entry.name}:{stat.st_mtime_ns}:{stat.st_size}"
+                    digest.update(etag_source.encode('utf-8', 'surrogateescape'))
+                etag = '"' + digest.hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Cache-Control', 'no-cache')
+                    self.end_headers()
+                    return
+            
+            items = []
+            prefix = subpath + '/' if subpath else ''
+            for entry, stat in entries:
+                filename = entry.name
+                relative_path = prefix + filename
+                
+                if stat is not None:
+                    items.append({
+                        "name": filename,
+                        "path": relative_path,
+                        "size": stat.st_size,
+                        "type": "file"
+                    })
+                else:
+                    # Calculate folder size
+                    folder_size = self.get_folder_size(entry.path) if want_sizes else None
+                    items.append({
+                        "name": filename,
+                        "path": relative_path,
+                        "size": folder_size,
+                        "type": "folder"
+                    })
+            
+            response_data = {
+                "items": items,
+                "currentPath": subpath,
+                "parentPath": os.path.dirname(subpath) if subpath else None
+            }
+            
+            response = json.dumps(response_data).encode()
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', len(response))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            if etag:
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'no-cache')
+            self.end_headers()
+            self.wfile.write(response)
+            
+        except Exception as e:
+            log_message(f"✗ Error listing files: {e}")
+            self.send_error(500, f"Error listing files: {str(e)}")
+    
+    def folder_size_json(self):
+        """Return the recursive size of a single folder"""
+        try:
+            parsed = urllib.parse.urlparse(self.path)
+            params = urllib.parse.parse_qs(parsed.query)
+            subpath = params.get('path', [''])[0].strip('/')
+            
+            target = resolve_shared_path(subpath)
+            if target is None:
+                self.send_error(403, "Access denied")
+                return
+            if not target.is_dir():
+                self.send_error(404, "Folder not found")
+                return
+            
+            response = json.dumps({
+                "path": subpath,
+                "size": self.get_folder_size(str(target))
+            }).encode()
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', len(response))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(response)
+            
+        except Exception as e:
+            log_message(f"✗ Error computing folder size: {e}")
+            self.send_error(500, f"Error computing folder size: {str(e)}")
+    
+    def get_folder_size(self, folder_path):
+        """Calculate total size of a folder"""
+        # Phase 1: collect file sizes with a single scandir pass per directory
+        sizes = array.array('q')
+        stack = [folder_path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        # Skip hidden files and directories
+                        if entry.name.startswith('.'):
+                            continue
+                        try:
+                            if entry.is_dir():
+                                # Like os.walk, don't descend into symlinked dirs
+                                if not entry.is_symlink():
+                                    stack.append(entry.path)
+                            else:
+                                sizes.append(entry.stat().st_size)
+                        except (OSError, IOError):
+                            pass
+            except (OSError, IOError):
+                pass
+        
+        # Phase 2: sum them, JIT-compiled for huge trees
+        if HAS_NUMBA and len(sizes) > NUMBA_MIN_FILES:
+            summer = folder_size_summer()
+            if summer is not None:
+                return summer(sizes)
+        return sum(sizes)
+    
+    def write_download_headers(self, code, content_type, filename, length=None, extra_headers=()):
+        """Write a download's status line and headers with a single socket write"""
+        self.log_request(code, '-' if length is None else length)
+        lines = [
+            f"{self.protocol_version} {code} {self.responses[code][0]}\r\n",
+            f"Content-Type: {content_type}\r\n",
+            f"Content-Disposition: {content_disposition(filename)}\r\n",
+        ]
+        lines.extend(f"{name}: {value}\r\n" for name, value in extra_headers)
+        if length is not None:
+            lines.append(f"Content-Length: {length}\r\n")
+        lines.append("\r\n")
+        self.wfile.write("".join(lines).encode('latin-1'))
+    
+    def send_zip_headers(self, zip_filename, length=None):
+        """Start a streamed ZIP response whose end is marked by closing the connection"""
+        # The archive size is only known up front when every entry is stored;
+        # otherwise the client reads until the connection closes
+        self.write_download_headers(200, 'application/zip', zip_filename, length,
+                                    [('Connection', 'close')])
+    
+    def download_folder(self):
+        """Download a folder as ZIP"""
+        headers_sent = False
+        try:
+            folder_path = urllib.parse.unquote(self.path[len("/download-folder/"):])
+            full_path = resolve_shared_path(folder_path)
+            if full_path is None:
+                self.send_error(403, "Access denied")
+                return
+            
+            if not full_path.is_dir():
+                self.send_error(404, "Folder not found")
+                return
+            
+            entries = list(iter_tree(full_path))
+            self.set_cork(True)
+            self.send_zip_headers(f"{full_path.name}.zip", stored_zip_size(entries))
+            headers_sent = True
+            
+            # Stream the ZIP straight to the socket; zipfile writes data
+            # descriptors since the socket isn't seekable
+            stream_zip(self.wfile, entries)
+            self.set_cork(False)
+            
+            log_message(f"✓ Downloaded folder: {folder_path}")
+            
+        except Exception as e:
+            log_message(f"✗ Folder download error: {e}")
+            if not headers_sent:
+                self.send_error(500, f"Download failed: {str(e)}")
+    
+    def download_selected(self):
+        """Download multiple selected files/folders as ZIP"""
+        headers_sent = False
+        try:
+            # Only the items field is needed, so scan the query string for it.
+            # The page percent-encodes each path and joins them with a literal
+            # comma, so split the raw value first and decode each path once
+            items_param = ''
+            for field in self.path.partition('?')[2].split('&'):
+                key, _, value = field.partition('=')
+                if key == 'items':
+                    items_param = value
+                    break
+            
+            items = [urllib.parse.unquote_to_bytes(item).decode('utf-8', 'replace')
+                     for item in items_param.split(',') if item]
+            
+            if not items:
+                self.send_error(400, "No items selected")
+                return
+            
+            item_paths = [resolve_shared_path(item) for item in items]
+            if None in item_paths:
+                self.send_error(403, "Access denied")
+                return
+            
+            entries = []
+            for item_path in item_paths:
+                if item_path.is_file():
+                    entries.append((str(item_path), item_path.name, item_path.stat()))
+                elif item_path.is_dir():
+                    entries.extend(iter_tree(item_path, item_path.name + '/'))
+            
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.set_cork(True)
+            self.send_zip_headers(f"download_{timestamp}.zip", stored_zip_size(entries))
+            headers_sent = True
+            
+            # Stream the ZIP straight to the socket; zipfile writes data
+            # descriptors since the socket isn't seekable
+            stream_zip(self.wfile, entries)
+            self.set_cork(False)
+            
+            log_message(f"✓ Downloaded {len(items)} selected items")
+            
+        except Exception as e:
+            log_message(f"✗ Batch download error: {e}")
+            if not headers_sent:
+                self.send_error(500, f"Download failed: {str(e)}")
+
+    def parse_range_header(self, size):
+        """Parse a single 'Range: bytes=' header into an inclusive (start, end)"""
+        # None means send the whole file (no header, multi-range or bad syntax,
+        # including a last-pos before the first-pos); ValueError means the
+        # range starts past the end of the file (416)
+        match = RANGE_RE.match(self.headers.get('Range', '').strip())
+        if not match or match.group(1) == match.group(2) == '':
+            return None
+        start_str, end_str = match.groups()
+        if start_str:
+            start = int(start_str)
+            if end_str and int(end_str) < start:
+                return None  # Invalid, not unsatisfiable (RFC 9110 14.1.1)
+            end = min(int(end_str), size - 1) if end_str else size - 1
+        else:
+            # Suffix range: the last N bytes of the file
+            suffix_length = int(end_str)
+            if suffix_length == 0:
+                raise ValueError("Empty suffix range")
+            start = max(0, size - suffix_length)
+            end = size - 1
+        if start >= size:
+            raise ValueError("Range not satisfiable")
+        return start, end
+    
+    def send_file_range(self, f, offset, length):
+        """Send length bytes of an open file starting at offset"""
+        if hasattr(os, 'sendfile'):
+            # Zero-copy: the kernel moves page-cache pages straight to the socket
+            out_fd = self.wfile.fileno()
+            in_fd = f.fileno()
+            while length > 0:
+                sent = os.sendfile(out_fd, in_fd, offset, length)
+                if sent == 0:
+                    break
+                offset += sent
+                length -= sent
+        elif length > MMAP_MIN_SIZE:
+            # Pages are faulted in on demand and handed to the socket without
+            # being copied into Python buffers first
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                with memoryview(mapped) as view:
+                    end = offset + length
+                    while offset < end:
+                        chunk_end = min(offset + COPY_CHUNK_SIZE, end)
+                        self.connection.sendall(view[offset:chunk_end])
+                        offset = chunk_end
+        else:
+            # Stream through one reusable buffer instead of reading the whole
+            # range into memory before the first byte goes out
+            f.seek(offset)
+            buffer = memoryview(bytearray(min(length, COPY_CHUNK_SIZE)))
+            while length > 0:
+                read = f.readinto(buffer[:min(length, COPY_CHUNK_SIZE)])
+                if not read:
+                    break
+                self.wfile.write(buffer[:read])
+                length -= read
+    
+    def download_file(self):
+        headers_sent = False
+        try:
+            file_path = urllib.parse.unquote(self.path[len("/download/"):])
+            filepath = resolve_shared_path(file_path)
+            if filepath is None:
+                self.send_error(403, "Access denied")
+                return
+            
+            if not filepath.is_file():
+                self.send_error(404, "File not found")
+                return
+            
+            file_stat = filepath.stat()
+            size = file_stat.st_size
+            last_modified = self.date_time_string(int(file_stat.st_mtime))
+            # A resumed download names the version it started with in If-Range;
+            # if the file has changed since, send the whole new file instead
+            if_range = self.headers.get('If-Range')
+            try:
+                if if_range is not None and if_range != last_modified:
+                    byte_range = None
+                else:
+                    byte_range = self.parse_range_header(size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', 0)
+                self.end_headers()
+                return
+            start, end = byte_range if byte_range else (0, size - 1)
+            
+            # Get just the filename for the download
+            filename = filepath.name
+            
+            with open(filepath, 'rb', buffering=0) as f:
+                self.set_cork(True)
+                extra_headers = [('Accept-Ranges', 'bytes'), ('Last-Modified', last_modified)]
+                if byte_range:
+                    extra_headers.append(('Content-Range', f'bytes {start}-{end}/{size}'))
+                self.write_download_headers(206 if byte_range else 200,
+                                            'application/octet-stream', filename,
+                                            end - start + 1, extra_headers)
+                headers_sent = True
+                self.send_file_range(f, start, end - start + 1)
+                self.set_cork(False)
+            
+            if byte_range:
+                log_message(f"✓ Downloaded: {file_path} (bytes {start}-{end})")
+            else:
+                log_message(f"✓ Downloaded: {file_path}")
+            
+        except Exception as e:
+            log_message(f"✗ Download error: {e}")
+            if not headers_sent:
+                self.send_error(500, f"Download failed: {str(e)}")
+
+    def show_web_interface(self):
+        self.upload_form()
+
+
+class InternetTransferHandler(HotspotTransferHandler):
+    """Handler for Internet/WiFi mode transfers - inherits from Hotspot with different styling"""
+    
+    page = INTERNET_PAGE
+
+
+def get_local_ip():
+    """Get local IP address"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        ip = s.getsockname()[0]
+        s.close()
+        return ip
+    except:
+        return "127.0.0.1"
+
+
+# Largest on-screen QR code size in pixels (fits the 140px QR box)
+QR_SIZE = 130
+# Rendered QR codes kept per URL, so restarting on the same address is instant
+QR_CACHE_SIZE = 4
+
+
+class NetTossGUI:
+    def __init__(self, root):
+        self.root = root
+        self.root.title("NetToss - Wireless File Transfer")
+        self.root.geometry("1050x900")
+        self.root.resizable(True, True)
+        self.root.minsize(850, 750)
+        
+        # Set window icon
+        self.set_window_icon()
+        
+        # Center window on screen
+        self.center_window(1050, 900)
+        
+        # Server state
+        self.server = None
+        self.server_thread = None
+        self.is_running = False
+        
+        # Serializes writes of connection_qr.png from QR worker threads
+        self.qr_save_lock = threading.Lock()
+        # url -> rendered PIL image, oldest first
+        self.qr_cache = {}
+        # One Tk photo image reused for every QR code shown
+        self.qr_image = None
+        
+        # Local IP for the server URL, looked up in the background
+        self.local_ip = None
+        
+        # Latest connection count, set from handler threads
+        self.latest_connection_count = 0
+        # Count currently on the label, so unchanged values skip the redraw
+        self.shown_connection_count = 0
+        
+        # Variables
+        self.mode_var = tk.StringVar(value="hotspot")
+        self.port_var = tk.StringVar(value=str(DEFAULT_PORT_HOTSPOT))
+        
+        # Build UI
         self.setup_ui()
         
+        # Start moving server log messages into the log widget
+        self.process_log_queue()
+        
+        # Have the IP ready before Start Server is clicked
+        self.refresh_local_ip()
+        
         # Handle window close
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
@@ -1687,7 +2488,10 @@ class NetTossGUI:
         port_label = ttk.Label(port_inner, text="🔌 Port:", style="CardText.TLabel")
         port_label.pack(side=tk.LEFT)
         
-        self.port_entry = ttk.Entry(port_inner, textvariable=self.port_var, width=10)
+        # Reject keystrokes that would make the port non-numeric or too large
+        port_vcmd = (self.root.register(self.validate_port), "%P")
+        self.port_entry = ttk.Entry(port_inner, textvariable=self.port_var, width=10,
+                                    validate="key", validatecommand=port_vcmd)
         self.port_entry.pack(side=tk.LEFT, padx=(10, 0))
         
         # Enable keyboard shortcuts for port entry
@@ -1863,6 +2667,7 @@ class NetTossGUI:
         # URL display frame with copy button
         url_frame = ttk.Frame(status_frame)
         url_frame.pack(fill=tk.X, pady=(5, 0))
+        url_frame.columnconfigure(0, weight=1)
         
         self.url_var = tk.StringVar(value="")
         self.url_entry = tk.Entry(
@@ -1879,7 +2684,7 @@ class NetTossGUI:
             highlightbackground=ThemeColors.BORDER,
             highlightcolor=ThemeColors.ACCENT_PRIMARY
         )
-        self.url_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.url_entry.grid(row=0, column=0, sticky="ew")
         self.url_entry.bind("<Button-1>", lambda e: self.open_browser())
         
         self.copy_btn = ttk.Button(
@@ -1889,8 +2694,9 @@ class NetTossGUI:
             style="Secondary.TButton",
             width=8
         )
-        self.copy_btn.pack(side=tk.RIGHT, padx=(5, 0))
-        self.copy_btn.pack_forget()  # Hide initially
+        # grid_remove() keeps these options, so showing it again is just grid()
+        self.copy_btn.grid(row=0, column=1, padx=(5, 0))
+        self.copy_btn.grid_remove()  # Hide initially
         
         # Folder Management inside status frame
         ttk.Separator(status_frame, orient='horizontal').pack(fill=tk.X, pady=8)
@@ -1933,7 +2739,7 @@ class NetTossGUI:
             log_container, 
             height=8, 
             font=("JetBrains Mono", 9),
-            wrap=tk.WORD,
+            wrap=tk.NONE,  # No re-wrapping on insert; long lines scroll sideways
             bg=ThemeColors.BG_SECONDARY,
             fg=ThemeColors.TEXT_SECONDARY,
             insertbackground=ThemeColors.ACCENT_PRIMARY,
@@ -1944,10 +2750,15 @@ class NetTossGUI:
             pady=8,
             highlightthickness=1,
             highlightbackground=ThemeColors.BORDER,
-            highlightcolor=ThemeColors.ACCENT_PRIMARY
+            highlightcolor=ThemeColors.ACCENT_PRIMARY,
+            # Read-only log: never record inserts/deletes for undo
+            undo=False,
+            autoseparators=False,
+            maxundo=0
         )
         log_scrollbar = ttk.Scrollbar(log_container, orient=tk.VERTICAL, command=self.log_text.yview)
-        self.log_text.configure(yscrollcommand=log_scrollbar.set)
+        log_hscrollbar = ttk.Scrollbar(log_container, orient=tk.HORIZONTAL, command=self.log_text.xview)
+        self.log_text.configure(yscrollcommand=log_scrollbar.set, xscrollcommand=log_hscrollbar.set)
         
         # Configure color tags for different log types
         self.log_text.tag_configure("timestamp", foreground=ThemeColors.LOG_TIME)
@@ -1958,8 +2769,11 @@ class NetTossGUI:
         self.log_text.tag_configure("normal", foreground=ThemeColors.TEXT_SECONDARY)
         
         log_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        log_hscrollbar.pack(side=tk.BOTTOM, fill=tk.X)
         self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         self.log_text.config(state=tk.DISABLED)
+        # Catch up as soon as the log is shown again
+        self.log_text.bind("<Visibility>", self.flush_log_queue)
         
         # Clear log button
         ttk.Button(log_frame, text="Clear Log", command=self.clear_log).pack(anchor=tk.E, pady=(5, 0))
@@ -1970,30 +2784,75 @@ class NetTossGUI:
             self.port_var.set(str(DEFAULT_PORT_HOTSPOT))
         else:
             self.port_var.set(str(DEFAULT_PORT_INTERNET))
+        # Hotspot and WiFi usually mean a different network, so look it up again
+        self.refresh_local_ip()
+    
+    def refresh_local_ip(self):
+        """Look up the local IP on a worker thread for the next Start Server"""
+        # get_local_ip() can block on a slow or missing network
+        def lookup():
+            self.local_ip = get_local_ip()
+        threading.Thread(target=lookup, daemon=True).start()
     
     def log(self, message):
         """Add message to log with color coding"""
+        # Queued like server messages, so a burst is inserted on the next
+        # flush with one state toggle and one scroll
+        log_message(message)
+    
+    def process_log_queue(self):
+        """Periodically move queued server messages into the log"""
+        self.flush_log_queue()
+        self.apply_connection_count()
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self.process_log_queue)
+    
+    def flush_log_queue(self, event=None):
+        """Drain queued messages into the log if it can be seen (runs on the Tk thread)"""
+        # While the window is minimized the bounded queue just keeps the
+        # newest messages, so background logging costs no widget updates
+        if log_queue and self.log_text.winfo_viewable():
+            messages = []
+            while log_queue:
+                messages.append(log_queue.popleft())
+            self.insert_log_lines(messages)
+    
+    def insert_log_lines(self, messages):
+        """Insert (time, message) pairs with one widget state toggle and one scroll"""
         self.log_text.config(state=tk.NORMAL)
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Insert timestamp with purple color
-        self.log_text.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        
-        # Determine message type and color
-        msg_lower = message.lower()
-        if "✓" in message or "success" in msg_lower or "started" in msg_lower or "uploaded" in msg_lower or "downloaded" in msg_lower or "copied" in msg_lower:
-            tag = "success"
-        elif "✗" in message or "error" in msg_lower or "failed" in msg_lower:
-            tag = "error"
-        elif "warning" in msg_lower:
-            tag = "warning"
-        elif "mode:" in msg_lower or "info" in msg_lower:
-            tag = "info"
-        else:
-            tag = "normal"
-        
-        self.log_text.insert(tk.END, f"{message}\n", tag)
-        self.log_text.see(tk.END)
+        # Only follow new lines if the user hasn't scrolled up to read history
+        at_bottom = self.log_text.yview()[1] >= 0.999
+        last_second = None
+        
+        for logged_at, message in messages:
+            # Bursts share a second, so only re-format when it changes
+            second = int(logged_at)
+            if second != last_second:
+                timestamp = time.strftime("%H:%M:%S", time.localtime(second))
+                last_second = second
+            
+            # Insert timestamp with purple color
+            self.log_text.insert(tk.END, f"[{timestamp}] ", "timestamp")
+            
+            # Determine message type and color: a leading ✓/✗ marker decides
+            # with one dict lookup, otherwise the first keyword found does
+            tag = LOG_MARKER_TAGS.get(message[:1])
+            if tag is None:
+                match = LOG_LEVEL_RE.search(message)
+                tag = match.lastgroup if match else "normal"
+            
+            self.log_text.insert(tk.END, f"{message}\n", tag)
+        
+        # Drop only the oldest lines so the widget never grows past the cap.
+        # Count the widget's own lines: a message (e.g. a file name) can
+        # contain newlines, so messages and lines don't match one to one.
+        # The text ends with a newline, so the last line is always empty
+        line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        if line_count > MAX_LOG_LINES:
+            excess = line_count - MAX_LOG_LINES
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+        
+        if at_bottom:
+            self.log_text.see(tk.END)
         self.log_text.config(state=tk.DISABLED)
     
     def clear_log(self):
@@ -2011,20 +2870,21 @@ class NetTossGUI:
     
     def start_server(self):
         """Start the HTTP server"""
-        try:
-            port = int(self.port_var.get())
-            if not (1 <= port <= 65535):
-                raise ValueError("Port out of range")
-        except ValueError:
+        # The entry only accepts digits up to 65535, so only empty and 0 remain
+        port_text = self.port_var.get()
+        if not port_text or int(port_text) == 0:
             messagebox.showerror("Error", "Invalid port number. Please enter a value between 1 and 65535.")
             return
+        port = int(port_text)
         
         mode = self.mode_var.get()
         handler = HotspotTransferHandler if mode == "hotspot" else InternetTransferHandler
         
-        # Custom HTTPServer with SO_REUSEADDR to allow immediate port reuse
-        class ReusableHTTPServer(HTTPServer):
+        # Custom HTTPServer with SO_REUSEADDR to allow immediate port reuse;
+        # each connection gets its own thread so a slow client can't block others
+        class ReusableHTTPServer(ThreadingHTTPServer):
             allow_reuse_address = True
+            daemon_threads = True
             
             def server_close(self):
                 self.socket.close()
@@ -2035,7 +2895,7 @@ class NetTossGUI:
             self.server_thread.start()
             
             self.is_running = True
-            self.url = f"http://{get_local_ip()}:{port}"
+            self.url = f"http://{self.local_ip or get_local_ip()}:{port}"
             
             # Update UI with modern styling
             self.start_btn.config(text="⏹  Stop Server", style="Danger.TButton")
@@ -2046,7 +2906,7 @@ class NetTossGUI:
             mode_text = "📶 Hotspot" if mode == "hotspot" else "🌐 WiFi"
             self.status_label.config(text=f"🟢  Server running ({mode_text})")
             self.url_var.set(self.url)
-            self.copy_btn.pack(side=tk.RIGHT, padx=(5, 0))  # Show copy button
+            self.copy_btn.grid()  # Show copy button
             
             # Generate QR code
             self.generate_qr(self.url)
@@ -2066,15 +2926,11 @@ class NetTossGUI:
             server_to_close = self.server
             self.server = None
             
-            # Shutdown synchronously to ensure port is released
-            try:
-                server_to_close.shutdown()
-            except Exception:
-                pass
-            try:
-                server_to_close.server_close()
-            except Exception:
-                pass
+            # shutdown() waits for serve_forever() to notice, up to its 0.5 s
+            # poll, so do it on a worker thread; Start stays disabled until the
+            # port has been released
+            self.start_btn.config(state=tk.DISABLED)
+            threading.Thread(target=self.shutdown_server, args=(server_to_close,), daemon=True).start()
         
         self.is_running = False
         
@@ -2085,12 +2941,32 @@ class NetTossGUI:
         self.port_entry.config(state=tk.NORMAL)
         self.status_label.config(text="⚫  Server stopped")
         self.url_var.set("")
-        self.copy_btn.pack_forget()  # Hide copy button
+        self.copy_btn.grid_remove()  # Hide copy button
         self.qr_label.config(image="", text="Start server\nto generate", bg=ThemeColors.BG_SECONDARY, fg=ThemeColors.TEXT_MUTED)
         reset_connection_count()  # Reset connection counter
+        self.refresh_local_ip()  # The network may change before the next start
         
         self.log("Server stopped")
     
+    def shutdown_server(self, server):
+        """Stop a server and release its port, then re-enable Start (worker thread)"""
+        try:
+            server.shutdown()
+        except Exception:
+            pass
+        try:
+            server.server_close()
+        except Exception:
+            pass
+        try:
+            self.root.after(0, self.on_server_closed)
+        except (RuntimeError, tk.TclError):
+            pass  # Window already closed
+    
+    def on_server_closed(self):
+        """Allow starting again once the old server's port is free"""
+        self.start_btn.config(state=tk.NORMAL)
+    
     def force_stop_server(self):
         """Force stop the HTTP server - more aggressive termination"""
         self.log("⚠ Force stopping server...")
@@ -2140,15 +3016,28 @@ class NetTossGUI:
         self.port_entry.config(state=tk.NORMAL)
         self.status_label.config(text="⚫  Server force stopped")
         self.url_var.set("")
-        self.copy_btn.pack_forget()
+        self.copy_btn.grid_remove()
         self.qr_label.config(image="", text="Start server\nto generate", bg=ThemeColors.BG_SECONDARY, fg=ThemeColors.TEXT_MUTED)
         reset_connection_count()
+        self.refresh_local_ip()
         
         self.log("✓ Server force stopped")
     
     def update_connection_count(self, count):
         """Update the connection counter display"""
-        self.connection_label.config(text=f"📊 Connections: {count}")
+        # Called from handler threads, possibly hundreds of times a second:
+        # only record the latest value; the Tk thread shows it on its next
+        # 100 ms tick
+        self.latest_connection_count = count
+    
+    def apply_connection_count(self):
+        """Show the latest recorded connection count (runs on the Tk thread)"""
+        # Only read here, never cleared: clearing it could drop a count a
+        # handler thread recorded in between, leaving the label stale
+        count = self.latest_connection_count
+        if count != self.shown_connection_count:
+            self.shown_connection_count = count
+            self.connection_label.config(text=f"📊 Connections: {count}")
     
     def on_ram_change(self):
         """Handle RAM value change from spinbox"""
@@ -2179,35 +3068,97 @@ class NetTossGUI:
                                 bg=ThemeColors.BG_SECONDARY, fg=ThemeColors.TEXT_MUTED)
             return
         
+        cached = self.qr_cache.get(url)
+        if cached is not None:
+            # Same address as an earlier start: reuse the image, only re-save it
+            self.display_qr_image(cached)
+            threading.Thread(target=self.save_qr_image, args=(cached,), daemon=True).start()
+            return
+        
+        # Encoding, resizing and saving run on a worker thread so starting
+        # the server doesn't stall the UI; Tk objects are only touched here
+        threading.Thread(target=self.build_qr_image, args=(url,), daemon=True).start()
+    
+    def build_qr_image(self, url):
+        """Render the QR code for url and hand it to the Tk thread (worker thread)"""
         try:
+            # Imported here, off the Tk thread; display_qr_image then finds
+            # ImageTk already loaded
+            import qrcode
+            from PIL import ImageTk
+            
             qr = qrcode.QRCode(version=1, box_size=5, border=2)
             qr.add_data(url)
             qr.make(fit=True)
             
+            # Draw the largest whole-pixel modules that fit QR_SIZE and show
+            # the image at that native size: any resize to exactly 130px would
+            # be a non-integer scale with uneven module widths. A LAN URL is
+            # a version 2 code (29 modules with border), so 4px -> 116px; the
+            # box's background matches, so the rest reads as quiet zone
+            modules_count = qr.modules_count + 2 * qr.border
+            qr.box_size = max(1, QR_SIZE // modules_count)
+            
             # Dark theme QR code colors
             img = qr.make_image(fill_color=ThemeColors.ACCENT_SECONDARY, back_color=ThemeColors.BG_SECONDARY)
+            img = img.convert("RGB")  # Plain PIL image, with any qrcode version
             
-            # Use compatible resize method (works with older PIL versions)
+        except Exception as e:
             try:
-                img = img.resize((130, 130), Image.Resampling.LANCZOS)
-            except AttributeError:
-                # Fallback for older PIL versions
-                img = img.resize((130, 130), Image.LANCZOS if hasattr(Image, 'LANCZOS') else Image.ANTIALIAS)
-            
-            self.qr_image = ImageTk.PhotoImage(img)
-            self.qr_label.config(image=self.qr_image, text="", bg=ThemeColors.BG_SECONDARY)
-            
-            # Also save QR code to script's directory
-            qr_path = os.path.join(SCRIPT_DIR, "connection_qr.png")
-            img.save(qr_path)
-            
+                self.root.after(0, self.show_qr_error, url, e)
+            except (RuntimeError, tk.TclError):
+                pass  # Window already closed
+            return
+        
+        try:
+            self.root.after(0, self.show_qr_image, url, img)
+        except (RuntimeError, tk.TclError):
+            return  # Window already closed
+        self.save_qr_image(img)
+    
+    def save_qr_image(self, img):
+        """Save the QR code to the script's directory (worker thread)"""
+        # Runs once the QR code is already on screen; the lock keeps quick
+        # restarts from writing the file concurrently
+        qr_path = os.path.join(SCRIPT_DIR, "connection_qr.png")
+        try:
+            with self.qr_save_lock:
+                img.save(qr_path)
         except Exception as e:
-            self.qr_label.config(text=f"QR Error:\n{str(e)[:30]}",
-                                bg=ThemeColors.BG_SECONDARY, fg=ThemeColors.ERROR)
+            log_message(f"✗ Could not save QR code: {e}")
+    
+    def show_qr_image(self, url, img):
+        """Display a rendered QR code if its server is still the running one"""
+        if not self.is_running or url != self.url:
+            return
+        self.display_qr_image(img)
+        
+        self.qr_cache[url] = img
+        if len(self.qr_cache) > QR_CACHE_SIZE:
+            del self.qr_cache[next(iter(self.qr_cache))]
+    
+    def display_qr_image(self, img):
+        """Show a QR image in the label, drawing into the existing photo image"""
+        # Pasting into the same PhotoImage keeps one Tk image alive instead of
+        # allocating a new one (and dropping the old) on every start
+        from PIL import ImageTk
+        if self.qr_image is not None and (self.qr_image.width(), self.qr_image.height()) == img.size:
+            self.qr_image.paste(img)
+        else:
+            self.qr_image = ImageTk.PhotoImage(img)
+        self.qr_label.config(image=self.qr_image, text="", bg=ThemeColors.BG_SECONDARY)
+    
+    def show_qr_error(self, url, error):
+        """Report a failed QR render if its server is still the running one"""
+        if not self.is_running or url != self.url:
+            return
+        self.qr_label.config(text=f"QR Error:\n{str(error)[:30]}",
+                            bg=ThemeColors.BG_SECONDARY, fg=ThemeColors.ERROR)
     
     def open_browser(self):
         """Open the server URL in browser"""
         if self.is_running:
+            import webbrowser
             webbrowser.open(self.url)
     
     def copy_url(self):
@@ -2222,6 +3173,10 @@ class NetTossGUI:
             self.root.after(1500, lambda: self.copy_btn.config(text=original_text))
             self.log(f"URL copied to clipboard: {self.url}")
     
+    def validate_port(self, proposed):
+        """Allow only edits that leave the port empty or a number up to 65535"""
+        return proposed == "" or (proposed.isascii() and proposed.isdigit() and int(proposed) <= 65535)
+    
     def select_all_entry(self, event):
         """Select all text in an Entry widget"""
         event.widget.select_range(0, tk.END)
@@ -2238,10 +3193,15 @@ class NetTossGUI:
         path = os.path.abspath(folder)
         if sys.platform == "win32":
             os.startfile(path)
-        elif sys.platform == "darwin":
-            os.system(f'open "{path}"')
-        else:
-            os.system(f'xdg-open "{path}"')
+            return
+        
+        # No shell: the path is passed as-is and the click returns immediately
+        import subprocess
+        opener = "open" if sys.platform == "darwin" else "xdg-open"
+        try:
+            subprocess.Popen([opener, path], stdin=subprocess.DEVNULL, close_fds=True)
+        except OSError as e:
+            self.log(f"✗ Could not open folder: {e}")
     
     def on_closing(self):
         """Handle window close"""
@@ -2250,110 +3210,56 @@ class NetTossGUI:
         self.root.destroy()
 
 
-def apply_modern_theme(root):
-    """Apply modern dark blue theme to the application"""
-    style = ttk.Style()
-    style.theme_use('clam')
-    
-    # Configure main window
-    root.configure(bg=ThemeColors.BG_DARK)
-    
+# ttk styles used by the window: name -> (configure options, state map or None)
+THEME_STYLES = {
     # Frame styles
-    style.configure(
-        "TFrame",
+    "TFrame": (dict(
         background=ThemeColors.BG_DARK
-    )
-    
-    style.configure(
-        "Card.TFrame",
-        background=ThemeColors.BG_CARD,
-        relief="flat"
-    )
+    ), None),
     
     # Label styles
-    style.configure(
-        "TLabel",
+    "TLabel": (dict(
         background=ThemeColors.BG_DARK,
         foreground=ThemeColors.TEXT_PRIMARY,
         font=("Segoe UI", 10)
-    )
-    
-    style.configure(
-        "Title.TLabel",
+    ), None),
+    "Title.TLabel": (dict(
         background=ThemeColors.BG_DARK,
         foreground=ThemeColors.TEXT_PRIMARY,
         font=("Segoe UI", 26, "bold")
-    )
-    
-    style.configure(
-        "Subtitle.TLabel",
+    ), None),
+    "Subtitle.TLabel": (dict(
         background=ThemeColors.BG_DARK,
         foreground=ThemeColors.TEXT_SECONDARY,
         font=("Segoe UI", 11)
-    )
-    
-    style.configure(
-        "Header.TLabel",
-        background=ThemeColors.BG_CARD,
-        foreground=ThemeColors.TEXT_PRIMARY,
-        font=("Segoe UI", 12, "bold")
-    )
-    
-    style.configure(
-        "Status.TLabel",
-        background=ThemeColors.BG_CARD,
-        foreground=ThemeColors.TEXT_PRIMARY,
-        font=("Segoe UI", 11)
-    )
-    
-    style.configure(
-        "URL.TLabel",
-        background=ThemeColors.BG_CARD,
-        foreground=ThemeColors.ACCENT_SECONDARY,
-        font=("Segoe UI", 10, "underline")
-    )
-    
-    style.configure(
-        "Muted.TLabel",
+    ), None),
+    "Muted.TLabel": (dict(
         background=ThemeColors.BG_CARD,
         foreground=ThemeColors.TEXT_MUTED,
         font=("Segoe UI", 9)
-    )
-    
-    style.configure(
-        "CardTitle.TLabel",
-        background=ThemeColors.BG_CARD,
-        foreground=ThemeColors.TEXT_PRIMARY,
-        font=("Segoe UI", 9, "bold")
-    )
-    
-    style.configure(
-        "CardText.TLabel",
+    ), None),
+    "CardText.TLabel": (dict(
         background=ThemeColors.BG_CARD,
         foreground=ThemeColors.TEXT_SECONDARY,
         font=("Segoe UI", 9)
-    )
+    ), None),
     
     # LabelFrame styles (cards)
-    style.configure(
-        "TLabelframe",
+    "TLabelframe": (dict(
         background=ThemeColors.BG_CARD,
         foreground=ThemeColors.TEXT_PRIMARY,
         bordercolor=ThemeColors.BORDER,
         relief="flat",
         borderwidth=2
-    )
-    
-    style.configure(
-        "TLabelframe.Label",
+    ), None),
+    "TLabelframe.Label": (dict(
         background=ThemeColors.BG_CARD,
         foreground=ThemeColors.ACCENT_SECONDARY,
         font=("Segoe UI", 11, "bold")
-    )
+    ), None),
     
     # Modern Button style
-    style.configure(
-        "TButton",
+    "TButton": (dict(
         background=ThemeColors.ACCENT_PRIMARY,
         foreground=ThemeColors.TEXT_PRIMARY,
         bordercolor=ThemeColors.ACCENT_PRIMARY,
@@ -2364,10 +3270,7 @@ def apply_modern_theme(root):
         focusthickness=0,
         padding=(20, 12),
         font=("Segoe UI", 10, "bold")
-    )
-    
-    style.map(
-        "TButton",
+    ), dict(
         background=[
             ("pressed", ThemeColors.ACCENT_GRADIENT_START),
             ("active", ThemeColors.ACCENT_SECONDARY),
@@ -2376,72 +3279,56 @@ def apply_modern_theme(root):
         foreground=[
             ("disabled", ThemeColors.TEXT_MUTED)
         ]
-    )
+    )),
     
     # Secondary Button style
-    style.configure(
-        "Secondary.TButton",
+    "Secondary.TButton": (dict(
         background=ThemeColors.BG_HOVER,
         foreground=ThemeColors.TEXT_PRIMARY,
         bordercolor=ThemeColors.BORDER,
         borderwidth=1,
         padding=(15, 8),
         font=("Segoe UI", 9)
-    )
-    
-    style.map(
-        "Secondary.TButton",
+    ), dict(
         background=[
             ("pressed", ThemeColors.BORDER),
             ("active", ThemeColors.BORDER_LIGHT)
         ]
-    )
+    )),
     
     # Success Button style - Soft teal
-    style.configure(
-        "Success.TButton",
+    "Success.TButton": (dict(
         background=ThemeColors.ACCENT_PRIMARY,
         foreground=ThemeColors.BG_DARK,
         padding=(20, 12),
         font=("Segoe UI", 10, "bold")
-    )
-    
-    style.map(
-        "Success.TButton",
+    ), dict(
         background=[
             ("pressed", ThemeColors.ACCENT_GRADIENT_START),
             ("active", ThemeColors.ACCENT_SECONDARY)
         ]
-    )
+    )),
     
     # Danger Button style - Soft coral
-    style.configure(
-        "Danger.TButton",
+    "Danger.TButton": (dict(
         background=ThemeColors.ERROR,
         foreground=ThemeColors.BG_DARK,
         padding=(20, 12),
         font=("Segoe UI", 10, "bold")
-    )
-    
-    style.map(
-        "Danger.TButton",
+    ), dict(
         background=[
             ("pressed", ThemeColors.ERROR_DARK),
             ("active", "#fca5a5")
         ]
-    )
+    )),
     
     # Radiobutton styles
-    style.configure(
-        "TRadiobutton",
+    "TRadiobutton": (dict(
         background=ThemeColors.BG_CARD,
         foreground=ThemeColors.TEXT_PRIMARY,
         focuscolor=ThemeColors.BG_CARD,
         font=("Segoe UI", 10)
-    )
-    
-    style.map(
-        "TRadiobutton",
+    ), dict(
         background=[
             ("active", ThemeColors.BG_CARD)
         ],
@@ -2449,11 +3336,10 @@ def apply_modern_theme(root):
             ("selected", ThemeColors.ACCENT_PRIMARY),
             ("!selected", ThemeColors.BORDER_LIGHT)
         ]
-    )
+    )),
     
     # Entry styles
-    style.configure(
-        "TEntry",
+    "TEntry": (dict(
         fieldbackground=ThemeColors.BG_SECONDARY,
         foreground=ThemeColors.TEXT_PRIMARY,
         insertcolor=ThemeColors.ACCENT_PRIMARY,
@@ -2462,40 +3348,47 @@ def apply_modern_theme(root):
         darkcolor=ThemeColors.BORDER,
         borderwidth=2,
         padding=(10, 8)
-    )
-    
-    style.map(
-        "TEntry",
+    ), dict(
         bordercolor=[
             ("focus", ThemeColors.ACCENT_PRIMARY)
         ],
         lightcolor=[
             ("focus", ThemeColors.ACCENT_PRIMARY)
         ]
-    )
+    )),
     
     # Separator style
-    style.configure(
-        "TSeparator",
+    "TSeparator": (dict(
         background=ThemeColors.BORDER
-    )
+    ), None),
     
     # Scrollbar style
-    style.configure(
-        "TScrollbar",
+    "TScrollbar": (dict(
         background=ThemeColors.BG_SECONDARY,
         troughcolor=ThemeColors.BG_DARK,
         bordercolor=ThemeColors.BG_DARK,
         arrowcolor=ThemeColors.TEXT_MUTED
-    )
-    
-    style.map(
-        "TScrollbar",
+    ), dict(
         background=[
             ("active", ThemeColors.ACCENT_PRIMARY),
             ("pressed", ThemeColors.ACCENT_SECONDARY)
         ]
-    )
+    )),
+}
+
+
+def apply_modern_theme(root):
+    """Apply modern dark blue theme to the application"""
+    style = ttk.Style()
+    style.theme_use('clam')
+    
+    # Configure main window
+    root.configure(bg=ThemeColors.BG_DARK)
+    
+    for name, (options, state_map) in THEME_STYLES.items():
+        style.configure(name, **options)
+        if state_map:
+            style.map(name, **state_map)
 
 
 def main():